@@ -1,268 +1,403 @@
-import pandas as pd
-
-def backtest_intraday_open_breakout(hist_df, pct=0.005, sl_pct=None, start_time="0:15", end_time="23:35"):
-    """
-    hist_df: 5-min dataframe with columns: open, high, low, close, time
-    pct: decimal fraction for trigger (0.005 = 0.5%)
-    sl_pct: decimal fraction for stop (if None, uses same as pct)
-    Returns: trades_df, metrics_dict
-    """
-    # normalize stoploss
-    if sl_pct is None:
-        sl_pct = pct
-
-    # ensure datetime index
-    df = hist_df.copy()
-    df.columns = df.columns.str.lower()
-    df["time"] = pd.to_datetime(df["time"])
-    df = df.set_index("time").sort_index()
-
-    trades = []
-
-    # add simple date column for grouping
-    df["trade_date"] = df.index.date
-
-    for day, day_data in df.groupby("trade_date"):
-        # restrict to trading hours
-        day_data = day_data.between_time(start_time, end_time)
-        if day_data.empty:
-            continue
-
-        # daily open = first candle open
-        day_open = float(day_data.iloc[0]["open"])
-        long_trigger = day_open * (1 + pct)
-        short_trigger = day_open * (1 - pct)
-
-        entry, trigger_ts, trade_type, sl = None, None, None, None
-
-        # find first trigger
-        for ts, row in day_data.iterrows():
-            if row["high"] >= long_trigger:
-                entry = long_trigger
-                trigger_ts = ts
-                trade_type = "LONG"
-                sl = entry * (1 - sl_pct)
-                break
-            elif row["low"] <= short_trigger:
-                entry = short_trigger
-                trigger_ts = ts
-                trade_type = "SHORT"
-                sl = entry * (1 + sl_pct)
-                break
-
-        if entry is None:
-            continue
-
-        # check stoploss
-        after = day_data.loc[trigger_ts:].iloc[1:]
-        exit_price, exit_ts, stop_hit = None, None, False
-
-        for ts, row in after.iterrows():
-            if trade_type == "LONG":
-                if float(row["low"]) <= sl:
-                    exit_price, exit_ts, stop_hit = sl, ts, True
-                    break
-            else:
-                if float(row["high"]) >= sl:
-                    exit_price, exit_ts, stop_hit = sl, ts, True
-                    break
-
-        if exit_price is None:
-            exit_price = float(day_data.iloc[-1]["close"])
-            exit_ts = day_data.index[-1]
-
-        pnl = (exit_price - entry) if trade_type == "LONG" else (entry - exit_price)
-
-        trades.append({
-            "Date": pd.to_datetime(str(day)),
-            "Type": trade_type,
-            "Entry": entry,
-            "Exit": exit_price,
-            "PnL": pnl,
-            "StopHit": bool(stop_hit),
-            "EntryTime": trigger_ts,
-            "ExitTime": exit_ts
-        })
-
-    trades_df = pd.DataFrame(trades)
-    if trades_df.empty:
-        metrics = {"Total_PnL": 0.0, "Max_Drawdown": 0.0, "Total_Trades": 0, "Win_Rate_pct": 0.0, "Avg_PnL": 0.0}
-        return trades_df, metrics
-
-    # metrics
-    trades_df = trades_df.sort_values("Date").reset_index(drop=True)
-    total_pnl = trades_df["PnL"].sum()
-    cumulative = trades_df["PnL"].cumsum()
-    running_max = cumulative.cummax()
-    drawdown = cumulative - running_max
-    max_dd = drawdown.min()
-    total_trades = len(trades_df)
-    win_rate = (trades_df["PnL"] > 0).mean() * 100
-    avg_pnl = trades_df["PnL"].mean()
-
-    metrics = {
-        "Total_PnL": float(total_pnl),
-        "Max_Drawdown": float(max_dd),
-        "Total_Trades": int(total_trades),
-        "Win_Rate_pct": float(win_rate),
-        "Avg_PnL": float(avg_pnl)
-    }
-
-    return trades_df, metrics
-
-
-
-def backtest_intraday_open_breakout2(hist_df, pct=0.005, sl_pct=None, start_time="00:15", end_time="23:35"):
-    """
-    hist_df: 5-min dataframe with DatetimeIndex and columns: open, high, low, close (case-insensitive)
-    pct: decimal fraction for trigger (0.005 = 0.5%)
-    sl_pct: decimal fraction for stop (if None, uses same as pct)
-    Returns: trades_df, metrics_dict
-    """
-    if sl_pct is None:
-        sl_pct = pct
-    df = hist_df.copy()
-    df.columns = df.columns.str.lower()
-    if "time" in df.columns:
-        df["time"] = pd.to_datetime(df["time"])
-        df = df.set_index("time")
-    df.index = pd.to_datetime(df.index)
-    df = df.sort_index()
-
-    trades = []
-    df["trade_date"] = df.index.date
-
-    for day, day_data in df.groupby("trade_date"):
-        day_data = day_data.between_time(start_time, end_time)
-        if day_data.empty:
-            continue
-
-        # daily open
-        day_open = float(day_data.iloc[0]["open"])
-        long_trigger = day_open * (1 + pct)
-        short_trigger = day_open * (1 - pct)
-
-        trade_count = 0
-        entry, trigger_ts, trade_type, sl = None, None, None, None
-
-        # --- First Trade ---
-        for ts, row in day_data.iterrows():
-            if row["high"] >= long_trigger:
-                entry, trigger_ts, trade_type = long_trigger, ts, "LONG"
-                sl = entry * (1 - sl_pct)
-                break
-            elif row["low"] <= short_trigger:
-                entry, trigger_ts, trade_type = short_trigger, ts, "SHORT"
-                sl = entry * (1 + sl_pct)
-                break
-
-        if entry is None:
-            continue
-
-        # Manage first trade
-        after = day_data.loc[trigger_ts:].iloc[1:]
-        exit_price, exit_ts, stop_hit = None, None, False
-
-        for ts, row in after.iterrows():
-            if trade_type == "LONG":
-                if float(row["low"]) <= sl:  # SL hit
-                    exit_price, exit_ts, stop_hit = sl, ts, True
-                    break
-            else:  # SHORT
-                if float(row["high"]) >= sl:
-                    exit_price, exit_ts, stop_hit = sl, ts, True
-                    break
-
-        if exit_price is None:  # SL not hit
-            exit_price, exit_ts, stop_hit = float(day_data.iloc[-1]["close"]), day_data.index[-1], False
-
-        pnl = (exit_price - entry) if trade_type == "LONG" else (entry - exit_price)
-        trades.append({"Date": pd.to_datetime(str(day)), "Type": trade_type,
-                       "Entry": entry, "Exit": exit_price, "PnL": pnl,
-                       "StopHit": stop_hit, "EntryTime": trigger_ts, "ExitTime": exit_ts})
-        trade_count += 1
-
-        # --- Second Trade (only if SL hit and trade_count < 2) ---
-        if stop_hit and trade_count < 2:
-            opposite_type = "SHORT" if trade_type == "LONG" else "LONG"
-            opp_entry = exit_price  # enter at SL price
-            opp_trigger_ts = exit_ts
-            opp_sl = opp_entry * (1 - sl_pct) if opposite_type == "LONG" else opp_entry * (1 + sl_pct)
-
-            after2 = day_data.loc[opp_trigger_ts:].iloc[1:]
-            opp_exit_price, opp_exit_ts, opp_stop_hit = None, None, False
-
-            for ts, row in after2.iterrows():
-                if opposite_type == "LONG":
-                    if float(row["low"]) <= opp_sl:
-                        opp_exit_price, opp_exit_ts, opp_stop_hit = opp_sl, ts, True
-                        break
-                else:  # SHORT
-                    if float(row["high"]) >= opp_sl:
-                        opp_exit_price, opp_exit_ts, opp_stop_hit = opp_sl, ts, True
-                        break
-
-            if opp_exit_price is None:
-                opp_exit_price, opp_exit_ts, opp_stop_hit = float(day_data.iloc[-1]["close"]), day_data.index[-1], False
-
-            pnl2 = (opp_exit_price - opp_entry) if opposite_type == "LONG" else (opp_entry - opp_exit_price)
-            trades.append({"Date": pd.to_datetime(str(day)), "Type": opposite_type,
-                           "Entry": opp_entry, "Exit": opp_exit_price, "PnL": pnl2,
-                           "StopHit": opp_stop_hit, "EntryTime": opp_trigger_ts, "ExitTime": opp_exit_ts})
-            trade_count += 1
-
-    trades_df = pd.DataFrame(trades)
-    if trades_df.empty:
-        metrics = {"Total_PnL": 0.0, "Max_Drawdown": 0.0, "Total_Trades": 0, "Win_Rate_pct": 0.0, "Avg_PnL": 0.0}
-        return trades_df, metrics
-
-    # metrics
-    trades_df = trades_df.sort_values(["Date", "EntryTime"]).reset_index(drop=True)
-    total_pnl = trades_df["PnL"].sum()
-    cumulative = trades_df["PnL"].cumsum()
-    running_max = cumulative.cummax()
-    drawdown = cumulative - running_max
-    max_dd = drawdown.min()
-    total_trades = len(trades_df)
-    win_rate = (trades_df["PnL"] > 0).mean() * 100
-    avg_pnl = trades_df["PnL"].mean()
-
-    metrics = {"Total_PnL": float(total_pnl),
-               "Max_Drawdown": float(max_dd),
-               "Total_Trades": int(total_trades),
-               "Win_Rate_pct": float(win_rate),
-               "Avg_PnL": float(avg_pnl)}
-
-    return trades_df, metrics
-
-
-
-btc_hist_data = pd.read_excel("btc_intraday_candles_2024-2025.xlsx")
-
-# Ensure 'time' is datetime
-btc_hist_data['time'] = pd.to_datetime(btc_hist_data['time'])
-
-# Function to filter by date range
-def filter_by_date(df, start_date, end_date):
-    """
-    Returns a new DataFrame with records between start_date and end_date.
-    
-    Args:
-        df (pd.DataFrame): Original DataFrame with a 'time' column.
-        start_date (str): Start date (YYYY-MM-DD).
-        end_date (str): End date (YYYY-MM-DD).
-    """
-    mask = (df['time'] >= start_date) & (df['time'] <= end_date)
-    return df.loc[mask].reset_index(drop=True)
-
-# Example usage
-filtered_df = filter_by_date(btc_hist_data, "2024-01-01", "2025-01-01")
-
-trades, metrics = backtest_intraday_open_breakout2(filtered_df, pct=0.003, sl_pct=0.002, start_time="0:50", end_time="23:35")
-print(metrics)
-#print(trades.head(50))
-#trades.to_excel("btc_open_breakout3_sl2_2025.xlsx")
-
-
-trades, metrics = backtest_intraday_open_breakout(filtered_df, pct=0.004, sl_pct=0.004, start_time="0:10", end_time="23:15")
-print(metrics)
\ No newline at end of file
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numba as nb
+import numpy as np
+import pandas as pd
+
+
+_EMPTY_METRICS = {"Total_PnL": 0.0, "Max_Drawdown": 0.0, "Total_Trades": 0, "Win_Rate_pct": 0.0, "Avg_PnL": 0.0}
+
+
+def _time_window_mask(idx, start_time, end_time):
+    """
+    Boolean time-of-day bitmap equivalent to between_time(start_time, end_time),
+    computed once with int64 arithmetic instead of a per-day index scan.
+    """
+    ns = idx.as_unit("ns").asi8
+    tod = ns % (86_400 * 1_000_000_000)
+    start_ns = pd.Timestamp("1970-01-01 " + start_time).as_unit("ns").value
+    end_ns = pd.Timestamp("1970-01-01 " + end_time).as_unit("ns").value
+    if start_ns <= end_ns:
+        return (tod >= start_ns) & (tod <= end_ns)
+    return (tod >= start_ns) | (tod <= end_ns)  # window wraps past midnight
+
+
+@nb.njit(parallel=True, cache=True, fastmath=True)
+def _scan_days(highs, lows, closes, starts, ends, long_trigs, short_trigs, sl_pct, max_trades,
+               out_entry, out_exit, out_long, out_entry_i, out_exit_i, out_stop, out_count):
+    """
+    Fused single-pass breakout scan over flat OHLC arrays; days run in parallel
+    via prange. starts/ends are the [start, end) positions of each day's bars.
+
+    Each bar is touched exactly once: a state variable tracks flat/long/short,
+    a stop-out reverses into the opposite side while fewer than max_trades
+    trades have fired, and a still-open position exits on the day's last close.
+    Day d writes its trades to slots [2*d, 2*d + out_count[d]); direction is a
+    bool (True = LONG) so the kernel stays object-free.
+    """
+    for d in nb.prange(len(starts)):
+        s = starts[d]
+        e = ends[d]
+        base = 2 * d
+        long_trigger = long_trigs[d]
+        short_trigger = short_trigs[d]
+
+        n = 0
+        dirn = 0.0  # 0 = flat, +1.0 = long, -1.0 = short
+        entry = 0.0
+        sl = 0.0
+        entry_i = -1
+
+        for k in range(s, e):
+            if dirn == 0.0:
+                if highs[k] >= long_trigger:  # long wins the tie, same as the old elif ordering
+                    dirn = 1.0
+                    entry = long_trigger
+                elif lows[k] <= short_trigger:
+                    dirn = -1.0
+                    entry = short_trigger
+                else:
+                    continue
+                sl = entry * (1.0 - dirn * sl_pct)
+                entry_i = k
+            else:
+                # sign-folded stop check: the adverse extreme crossing the stop
+                # is dirn*(adverse - sl) <= 0 for either side
+                adverse = lows[k] if dirn > 0.0 else highs[k]
+                if dirn * (adverse - sl) <= 0.0:
+                    # stop hit: record the trade, then reverse at the SL price if allowed
+                    out_entry[base + n] = entry
+                    out_exit[base + n] = sl
+                    out_long[base + n] = dirn > 0.0
+                    out_entry_i[base + n] = entry_i
+                    out_exit_i[base + n] = k
+                    out_stop[base + n] = True
+                    n += 1
+                    if n < max_trades:
+                        dirn = -dirn
+                        entry = sl
+                        sl = entry * (1.0 - dirn * sl_pct)
+                        entry_i = k
+                    else:
+                        dirn = 0.0
+                        break
+
+        if dirn != 0.0:  # still in a trade at end of day: exit on the last close
+            out_entry[base + n] = entry
+            out_exit[base + n] = closes[e - 1]
+            out_long[base + n] = dirn > 0.0
+            out_entry_i[base + n] = entry_i
+            out_exit_i[base + n] = e - 1
+            out_stop[base + n] = False
+            n += 1
+        out_count[d] = n
+
+
+@nb.njit(parallel=True, cache=True, fastmath=True)
+def _scan_grid(highs, lows, closes, starts, ends, long_trigs, short_trigs, sl_pcts, max_trades,
+               out_total, out_maxdd, out_trades, out_wins):
+    """
+    Same fused scan as _scan_days, evaluated for a whole batch of parameter
+    configurations with prange over the parameter axis. long_trigs/short_trigs
+    are (n_days, n_params) matrices; metrics are aggregated per configuration
+    in place of materializing every trade.
+    """
+    for p in nb.prange(sl_pcts.shape[0]):
+        sl_pct = sl_pcts[p]
+        total = 0.0
+        cum = 0.0
+        peak = -np.inf
+        max_dd = 0.0
+        n_tr = 0
+        wins = 0
+        for d in range(len(starts)):
+            s = starts[d]
+            e = ends[d]
+            long_trigger = long_trigs[d, p]
+            short_trigger = short_trigs[d, p]
+
+            n = 0
+            dirn = 0.0
+            entry = 0.0
+            sl = 0.0
+            for k in range(s, e):
+                if dirn == 0.0:
+                    if highs[k] >= long_trigger:
+                        dirn = 1.0
+                        entry = long_trigger
+                    elif lows[k] <= short_trigger:
+                        dirn = -1.0
+                        entry = short_trigger
+                    else:
+                        continue
+                    sl = entry * (1.0 - dirn * sl_pct)
+                else:
+                    adverse = lows[k] if dirn > 0.0 else highs[k]
+                    if dirn * (adverse - sl) <= 0.0:
+                        pnl = dirn * (sl - entry)
+                        total += pnl
+                        cum += pnl
+                        if cum > peak:
+                            peak = cum
+                        if cum - peak < max_dd:
+                            max_dd = cum - peak
+                        n_tr += 1
+                        if pnl > 0.0:
+                            wins += 1
+                        n += 1
+                        if n < max_trades:
+                            dirn = -dirn
+                            entry = sl
+                            sl = entry * (1.0 - dirn * sl_pct)
+                        else:
+                            dirn = 0.0
+                            break
+            if dirn != 0.0:
+                pnl = dirn * (closes[e - 1] - entry)
+                total += pnl
+                cum += pnl
+                if cum > peak:
+                    peak = cum
+                if cum - peak < max_dd:
+                    max_dd = cum - peak
+                n_tr += 1
+                if pnl > 0.0:
+                    wins += 1
+
+        out_total[p] = total
+        out_maxdd[p] = max_dd
+        out_trades[p] = n_tr
+        out_wins[p] = wins
+
+
+def _prepare(hist_df):
+    """
+    Normalize a raw OHLC frame once: lower-cased columns, datetime index named
+    'time', sorted ascending. A frame whose index is already named 'time' is
+    treated as prepared and passed through, so the same normalized frame can be
+    shared across backtest calls without redoing the work.
+    """
+    df = hist_df
+    if df.index.name != "time":
+        df = df.rename(columns=str.lower)
+        if "time" in df.columns:
+            if not pd.api.types.is_datetime64_any_dtype(df["time"]):
+                df["time"] = pd.to_datetime(df["time"])
+            df = df.set_index("time")
+        if not pd.api.types.is_datetime64_any_dtype(df.index):
+            df.index = pd.to_datetime(df.index)
+        df.index.name = "time"
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    return df
+
+
+def _scan_to_trades(df, pct, sl_pct, max_trades):
+    """Run the fused kernel over a windowed frame and assemble trades + metrics."""
+    # float32 halves the bytes moved through cache on the compare kernels;
+    # 5-min crypto prices fit comfortably in float32 range/precision
+    opens = np.ascontiguousarray(df["open"].to_numpy(), dtype=np.float32)
+    highs = np.ascontiguousarray(df["high"].to_numpy(), dtype=np.float32)
+    lows = np.ascontiguousarray(df["low"].to_numpy(), dtype=np.float32)
+    closes = np.ascontiguousarray(df["close"].to_numpy(), dtype=np.float32)
+    idx = df.index.values
+    idx_ns = df.index.as_unit("ns").asi8  # raw int64 ns, no Timestamp boxing
+
+    day_keys, starts = np.unique(idx.astype("datetime64[D]"), return_index=True)
+    ends = np.append(starts[1:], len(df))
+    n_days = len(starts)
+
+    # trigger levels for every day in two vectorized multiplies instead of
+    # per-day scalar arithmetic
+    day_opens = opens[starts].astype(np.float64)
+    long_trigs = day_opens * (1 + pct)
+    short_trigs = day_opens * (1 - pct)
+
+    out_entry = np.empty(2 * n_days)
+    out_exit = np.empty(2 * n_days)
+    out_long = np.zeros(2 * n_days, dtype=np.bool_)
+    out_entry_i = np.zeros(2 * n_days, dtype=np.int64)
+    out_exit_i = np.zeros(2 * n_days, dtype=np.int64)
+    out_stop = np.zeros(2 * n_days, dtype=np.bool_)
+    out_count = np.zeros(n_days, dtype=np.int64)
+
+    _scan_days(highs, lows, closes, starts, ends, long_trigs, short_trigs,
+               float(sl_pct), max_trades, out_entry, out_exit, out_long,
+               out_entry_i, out_exit_i, out_stop, out_count)
+
+    # slot d*2 + t is valid when day d produced more than t trades
+    valid = (np.arange(2 * n_days) % 2) < np.repeat(out_count, 2)
+    if not valid.any():
+        return pd.DataFrame(), dict(_EMPTY_METRICS)
+
+    long_v = out_long[valid]
+    entry_v = out_entry[valid]
+    exit_v = out_exit[valid]
+    pnl = np.where(long_v, exit_v - entry_v, entry_v - exit_v)
+
+    trades_df = pd.DataFrame({
+        "Date": np.repeat(day_keys, 2)[valid].astype("datetime64[ns]"),
+        "Type": np.where(long_v, "LONG", "SHORT"),
+        "Entry": entry_v,
+        "Exit": exit_v,
+        "PnL": pnl,
+        "StopHit": out_stop[valid],
+        # zero-copy reinterpretation of the gathered int64 ns values
+        "EntryTime": idx_ns[out_entry_i[valid]].view("datetime64[ns]"),
+        "ExitTime": idx_ns[out_exit_i[valid]].view("datetime64[ns]")
+    })
+
+    # metrics: single NumPy pass on the raw PnL array (trades already in date order)
+    cum = np.cumsum(pnl)
+    max_dd = (cum - np.maximum.accumulate(cum)).min()
+
+    metrics = {
+        "Total_PnL": float(pnl.sum()),
+        "Max_Drawdown": float(max_dd),
+        "Total_Trades": int(len(pnl)),
+        "Win_Rate_pct": float((pnl > 0).mean() * 100),
+        "Avg_PnL": float(pnl.mean())
+    }
+
+    return trades_df, metrics
+
+
+def backtest_intraday_open_breakout(hist_df, pct=0.005, sl_pct=None, start_time="0:15", end_time="23:35"):
+    """
+    hist_df: 5-min dataframe with columns: open, high, low, close, time
+    pct: decimal fraction for trigger (0.005 = 0.5%)
+    sl_pct: decimal fraction for stop (if None, uses same as pct)
+    Returns: trades_df, metrics_dict
+    """
+    # normalize stoploss
+    if sl_pct is None:
+        sl_pct = pct
+
+    # normalize once (no-op when the caller already passed a prepared frame),
+    # then restrict to trading hours and scan the whole frame in one native pass
+    df = _prepare(hist_df)
+    df = df[_time_window_mask(df.index, start_time, end_time)]
+    if df.empty:
+        return pd.DataFrame(), dict(_EMPTY_METRICS)
+
+    return _scan_to_trades(df, pct, sl_pct, max_trades=1)
+
+
+def backtest_intraday_open_breakout2(hist_df, pct=0.005, sl_pct=None, start_time="00:15", end_time="23:35"):
+    """
+    hist_df: 5-min dataframe with DatetimeIndex and columns: open, high, low, close (case-insensitive)
+    pct: decimal fraction for trigger (0.005 = 0.5%)
+    sl_pct: decimal fraction for stop (if None, uses same as pct)
+    Returns: trades_df, metrics_dict
+    """
+    if sl_pct is None:
+        sl_pct = pct
+    df = _prepare(hist_df)
+    df = df[_time_window_mask(df.index, start_time, end_time)]
+    if df.empty:
+        return pd.DataFrame(), dict(_EMPTY_METRICS)
+
+    return _scan_to_trades(df, pct, sl_pct, max_trades=2)
+
+
+def grid_backtest_intraday_open_breakout(hist_df, pcts, sl_pcts=None, start_time="0:15",
+                                         end_time="23:35", max_trades=1):
+    """
+    hist_df: 5-min dataframe accepted by the single-run backtests
+    pcts/sl_pcts: equal-length 1-D arrays of paired (pct, sl_pct) configurations;
+                  build a full cross product with np.meshgrid + ravel if wanted.
+                  sl_pcts defaults to pcts, mirroring the single-run functions.
+    max_trades: 1 for the single-trade strategy, 2 for reverse-on-stop
+    Returns: metrics DataFrame with one row per configuration
+
+    The whole grid is evaluated in one pass over the data: trigger levels are
+    broadcast to a (n_days, n_params) matrix and the kernel sweeps parameter
+    configurations in parallel.
+    """
+    pcts = np.asarray(pcts, dtype=np.float64)
+    sl_pcts = pcts if sl_pcts is None else np.asarray(sl_pcts, dtype=np.float64)
+    if sl_pcts.shape != pcts.shape:
+        raise ValueError("pcts and sl_pcts must have the same shape")
+
+    out_total = np.zeros(len(pcts))
+    out_maxdd = np.zeros(len(pcts))
+    out_trades = np.zeros(len(pcts), dtype=np.int64)
+    out_wins = np.zeros(len(pcts), dtype=np.int64)
+
+    df = _prepare(hist_df)
+    df = df[_time_window_mask(df.index, start_time, end_time)]
+    if not df.empty:
+        highs = np.ascontiguousarray(df["high"].to_numpy(), dtype=np.float32)
+        lows = np.ascontiguousarray(df["low"].to_numpy(), dtype=np.float32)
+        closes = np.ascontiguousarray(df["close"].to_numpy(), dtype=np.float32)
+        idx = df.index.values
+
+        day_keys, starts = np.unique(idx.astype("datetime64[D]"), return_index=True)
+        ends = np.append(starts[1:], len(df))
+
+        # (n_days, n_params) trigger matrices from one broadcast multiply each;
+        # float32 day opens keep trigger levels identical to the single-run path
+        day_opens = df["open"].to_numpy(dtype=np.float32)[starts].astype(np.float64)
+        long_trigs = day_opens[:, None] * (1 + pcts[None, :])
+        short_trigs = day_opens[:, None] * (1 - pcts[None, :])
+
+        _scan_grid(highs, lows, closes, starts, ends, long_trigs, short_trigs,
+                   sl_pcts, max_trades, out_total, out_maxdd, out_trades, out_wins)
+
+    traded = np.maximum(out_trades, 1)  # avoid 0/0 on configs that never trigger
+    return pd.DataFrame({
+        "pct": pcts,
+        "sl_pct": sl_pcts,
+        "Total_PnL": out_total,
+        "Max_Drawdown": out_maxdd,
+        "Total_Trades": out_trades,
+        "Win_Rate_pct": out_wins / traded * 100,
+        "Avg_PnL": out_total / traded
+    })
+
+
+# Function to filter by date range
+def filter_by_date(df, start_date, end_date):
+    """
+    Returns a new (prepared, time-indexed) DataFrame with records between
+    start_date and end_date, located by binary search on the sorted
+    DatetimeIndex instead of full-column boolean masks.
+
+    Args:
+        df (pd.DataFrame): DataFrame with a 'time' column or DatetimeIndex.
+        start_date (str): Start date (YYYY-MM-DD).
+        end_date (str): End date (YYYY-MM-DD).
+    """
+    df = _prepare(df)
+    lo = df.index.searchsorted(pd.Timestamp(start_date), side="left")
+    hi = df.index.searchsorted(pd.Timestamp(end_date), side="right")
+    return df.iloc[lo:hi]
+
+# Example usage; guarded so worker processes importing this module don't re-run it
+if __name__ == "__main__":
+    # openpyxl parses XML cell by cell, so convert to Parquet once and read that thereafter
+    _cache_path = Path("btc_intraday_candles_2024-2025.parquet")
+    if not _cache_path.exists():
+        pd.read_excel("btc_intraday_candles_2024-2025.xlsx").to_parquet(_cache_path)
+    btc_hist_data = pd.read_parquet(_cache_path)
+
+    # Ensure 'time' is datetime
+    btc_hist_data['time'] = pd.to_datetime(btc_hist_data['time'])
+
+    # filter_by_date already returns a prepared, time-indexed frame shared by both runs
+    prepared_df = filter_by_date(btc_hist_data, "2024-01-01", "2025-01-01")
+
+    # the two runs are independent, so farm them out to separate processes
+    with ProcessPoolExecutor(max_workers=2) as ex:
+        futs = [
+            ex.submit(backtest_intraday_open_breakout2, prepared_df,
+                      pct=0.003, sl_pct=0.002, start_time="0:50", end_time="23:35"),
+            ex.submit(backtest_intraday_open_breakout, prepared_df,
+                      pct=0.004, sl_pct=0.004, start_time="0:10", end_time="23:15"),
+        ]
+        for fut in futs:
+            trades, metrics = fut.result()
+            print(metrics)
+            #print(trades.head(50))
+            #trades.to_excel("btc_open_breakout3_sl2_2025.xlsx")